@@ -3,7 +3,7 @@ XBRL Parser - A module for parsing and analyzing XBRL financial reports.
 """
 
 from .parser import XBRLParser, parse_xbrl_file, find_xbrl_files
-from .analyzer import categorize_concepts, identify_contexts
+from .analyzer import categorize_concepts, identify_contexts, prepare_context
 from .generator import generate_financial_statements, create_excel_report
 
 __version__ = '0.1.0'
@@ -13,6 +13,7 @@ __all__ = [
     'find_xbrl_files',
     'categorize_concepts',
     'identify_contexts',
+    'prepare_context',
     'generate_financial_statements',
     'create_excel_report'
 ]
\ No newline at end of file
@@ -12,29 +12,29 @@ def convert_to_dataframe(facts):
     Convert extracted facts to a pandas DataFrame.
 
     Args:
-        facts (list): List of fact dictionaries
+        facts (list or pandas.DataFrame): List of fact dictionaries, or a
+            DataFrame of facts as returned by XBRLParser.parse_directory
 
     Returns:
         pandas.DataFrame: DataFrame containing the facts
     """
-    df = pd.DataFrame(facts)
+    df = facts.copy() if isinstance(facts, pd.DataFrame) else pd.DataFrame(facts)
 
     if 'unit' in df.columns:
         df['unit'] = df['unit'].fillna('NoUnit')
 
     # Process dimensions into separate columns
-    if facts and 'dimensions' in facts[0]:
+    if 'dimensions' in df.columns:
         all_dims = set()
-        for fact in facts:
-            all_dims.update(fact.get('dimensions', {}).keys())
+        for dims in df['dimensions']:
+            if isinstance(dims, dict):
+                all_dims.update(dims.keys())
 
-        # Create columns for dimensions
+        # Create columns for dimensions with one pass over the column
+        # per dimension, instead of iterrows() with per-cell writes
         for dim in all_dims:
-            df[f'dim_{dim}'] = None
-            for i, row in df.iterrows():
-                dims = row.get('dimensions', {})
-                if dim in dims:
-                    df.at[i, f'dim_{dim}'] = dims[dim]
+            df[f'dim_{dim}'] = [dims.get(dim) if isinstance(dims, dict) else None
+                                for dims in df['dimensions']]
 
         # Drop the dimensions column
         if 'dimensions' in df.columns:
@@ -265,6 +265,25 @@ def identify_contexts(df, verbose=False):
     return context_types
 
 
+def prepare_context(df, verbose=False):
+    """
+    Categorize concepts and identify context periods in one step.
+
+    Preferred entry point for callers that generate several outputs from
+    the same DataFrame; the results can be passed to
+    generate_financial_statements and create_excel_report so the two
+    full-frame scans run only once.
+
+    Args:
+        df (pandas.DataFrame): DataFrame containing XBRL facts
+        verbose (bool): Whether to print detailed analysis
+
+    Returns:
+        tuple: (statement concepts dict, context types dict)
+    """
+    return categorize_concepts(df, verbose), identify_contexts(df, verbose)
+
+
 def get_statement_data(df, concepts, context_id, verbose=False):
     """
     Extract data for a specific statement type and context period.
@@ -296,12 +315,13 @@ def get_statement_data(df, concepts, context_id, verbose=False):
     if 'numeric_value' not in filtered_data.columns:
         filtered_data['numeric_value'] = pd.to_numeric(filtered_data['value'], errors='coerce')
 
-    # Print a few examples of the data
+    # Print a few examples of the data; itertuples skips the Series
+    # construction iterrows() would do per row
     if verbose and not filtered_data.empty:
         print("Sample data:")
-        sample = filtered_data.head(3)
-        for _, row in sample.iterrows():
-            print(f"  {row['prefixed_concept']}: {row['unit']} {row['numeric_value']:,.2f}")
+        sample = filtered_data[['prefixed_concept', 'unit', 'numeric_value']].head(3)
+        for concept, unit, value in sample.itertuples(index=False, name=None):
+            print(f"  {concept}: {unit} {value:,.2f}")
 
     return filtered_data
 
@@ -321,6 +341,11 @@ def create_pivot_view(df):
     if 'numeric_value' not in df_copy.columns:
         df_copy['numeric_value'] = pd.to_numeric(df_copy['value'], errors='coerce')
 
+    # Categorical keys let the pivot hash small integer codes instead of
+    # re-hashing the concept/context strings per row
+    df_copy['prefixed_concept'] = df_copy['prefixed_concept'].astype('category')
+    df_copy['context_id'] = df_copy['context_id'].astype('category')
+
     # Create a pivot table with concepts as rows and contexts as columns
     pivot = df_copy.pivot_table(
         index='prefixed_concept',
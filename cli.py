@@ -7,7 +7,7 @@ import argparse
 import pandas as pd
 
 from .parser import XBRLParser
-from .analyzer import convert_to_dataframe
+from .analyzer import convert_to_dataframe, prepare_context
 from .generator import generate_financial_statements, create_excel_report
 from .utils import save_to_csv, create_simplified_excel, print_data_summary
 
@@ -32,7 +32,7 @@ def main():
     # Parse XBRL files
     facts = xbrl_parser.parse_directory(args.directory)
 
-    if not facts:
+    if facts.empty:
         print("No facts were extracted from XBRL files.")
         return 1
 
@@ -43,10 +43,16 @@ def main():
     if args.verbose:
         print_data_summary(df)
 
+    # Categorize concepts and identify contexts once for all reports
+    statement_concepts = context_types = None
+    if args.format in ['txt', 'excel', 'all']:
+        statement_concepts, context_types = prepare_context(df, args.verbose)
+
     # Generate and save outputs based on format
     if args.format in ['txt', 'all']:
         # Generate text report
-        report = generate_financial_statements(df, args.verbose)
+        report = generate_financial_statements(df, args.verbose,
+                                               statement_concepts, context_types)
         report_file = os.path.join(args.output, "financial_report.txt")
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write(report)
@@ -55,7 +61,8 @@ def main():
     if args.format in ['excel', 'all']:
         # Generate Excel report
         excel_file = os.path.join(args.output, "financial_statements.xlsx")
-        create_excel_report(df, excel_file, args.verbose)
+        create_excel_report(df, excel_file, args.verbose,
+                            statement_concepts, context_types)
         print(f"Excel report saved to: {excel_file}")
 
         # Create simplified Excel
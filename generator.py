@@ -5,13 +5,67 @@ Financial statement generation from XBRL data.
 import os
 import re
 import pandas as pd
+from functools import lru_cache
 from .analyzer import categorize_concepts, identify_contexts, get_statement_data, create_pivot_view
 
+# Matches the position before each capital letter (except the first)
+_CAPS_RE = re.compile(r'(?<!^)(?=[A-Z])')
 
+# Statement sections and their match patterns (case-insensitive)
+_SECTION_DEFS = {
+    'balance_sheet': {
+        'Assets': ['asset', 'activo', 'cash', 'inventory', 'receivable', 'property', 'investment'],
+        'Liabilities': ['liability', 'pasivo', 'payable', 'debt', 'borrowing', 'loan'],
+        'Equity': ['equity', 'patrimonio', 'capital', 'retained', 'earning', 'reserve', 'share']
+    },
+    'income_statement': {
+        'Revenue': ['revenue', 'ingreso', 'income', 'sale', 'venta'],
+        'Expenses': ['expense', 'gasto', 'cost', 'costo', 'charge'],
+        'Profit/Loss': ['profit', 'loss', 'ganancia', 'perdida', 'resultado', 'earning'],
+        'Other Items': ['tax', 'impuesto', 'comprehensive', 'other', 'otro', 'dividend']
+    },
+    'cashflow': {
+        'Operating Activities': ['operating', 'operacion', 'operation'],
+        'Investing Activities': ['investing', 'inversion', 'investment'],
+        'Financing Activities': ['financing', 'financiamiento', 'finance'],
+        'Cash Summary': ['cashandcashequivalent', 'efectivo', 'netincrease', 'netdecrease', 'beginning', 'end']
+    }
+}
+
+# One compiled regex per section, built once at import time
+_SECTION_REGEXES = {
+    name: {section: re.compile('|'.join(map(re.escape, patterns)), re.IGNORECASE)
+           for section, patterns in sections.items()}
+    for name, sections in _SECTION_DEFS.items()
+}
+
+
+def _group_by_context(df, context_ids):
+    """
+    Slice a fact DataFrame once per context ID of interest.
+
+    Args:
+        df (pandas.DataFrame): DataFrame containing XBRL facts
+        context_ids (iterable): Context IDs worth keeping
+
+    Returns:
+        dict: Mapping of context ID to its slice of df
+    """
+    wanted = {c for c in context_ids if c}
+    if not wanted or df.empty:
+        return {}
+    return {context_id: data for context_id, data in df.groupby('context_id', sort=False)
+            if context_id in wanted}
+
+
+@lru_cache(maxsize=None)
 def format_concept_name(concept):
     """
     Format prefixed concept names for display.
 
+    The result is cached since the same prefixed concepts recur across
+    periods and statements.
+
     Args:
         concept (str): Concept name
 
@@ -23,167 +77,146 @@ def format_concept_name(concept):
         concept = concept.split(':', 1)[1]
 
     # Add space before each capital letter and capitalize first letter
-    formatted = re.sub(r'(?<!^)(?=[A-Z])', ' ', concept)
+    formatted = _CAPS_RE.sub(' ', concept)
     return formatted.title()
 
 
-def create_balance_sheet(df, concepts, context_types, verbose=False):
+def _build_statement(df, concepts, context_types, title, sections, period_keys, verbose=False):
     """
-    Create a formatted balance sheet report.
+    Build a formatted statement report from sections and period context keys.
+
+    Shared implementation behind the balance sheet, income statement and
+    cash flow statement builders.
 
     Args:
         df (pandas.DataFrame): DataFrame containing XBRL facts
-        concepts (list): List of balance sheet concepts
+        concepts (list): List of concepts for this statement type
         context_types (dict): Dictionary mapping context types to context IDs
+        title (str): Report title, e.g. "BALANCE SHEET"
+        sections (dict): Mapping of section name to compiled match regex
+        period_keys (list): List of (period_label, context_type_key) tuples
         verbose (bool): Whether to print detailed generation
 
     Returns:
-        str: Formatted balance sheet report
+        str: Formatted statement report
     """
-    # Define sections and their patterns (case-insensitive)
-    sections = {
-        'Assets': ['asset', 'activo', 'cash', 'inventory', 'receivable', 'property', 'investment'],
-        'Liabilities': ['liability', 'pasivo', 'payable', 'debt', 'borrowing', 'loan'],
-        'Equity': ['equity', 'patrimonio', 'capital', 'retained', 'earning', 'reserve', 'share']
-    }
+    statement_name = title.lower()
+    # Collect the report as a list of fragments and join once at the end,
+    # avoiding repeated string reallocation as the report grows
+    parts = [f"{title}\n{'=' * (len(title) - 1)}\n"]
+
+    # Map each concept to its first matching section with one vectorized
+    # scan per section, rather than a Python pass per section per period
+    concepts_series = pd.Series(concepts, dtype=object)
+    section_of = {}
+    for section, regex in sections.items():
+        mask = concepts_series.str.contains(regex)
+        for concept in concepts_series[mask]:
+            section_of.setdefault(concept, section)
+
+    # Group the matched concepts back by section, keeping section order
+    section_concepts = {section: [] for section in sections}
+    for concept, section in section_of.items():
+        section_concepts[section].append(concept)
+    for section in list(section_concepts):
+        if not section_concepts[section]:
+            if verbose:
+                print(f"No concepts found for section: {section}")
+            del section_concepts[section]
 
-    report = "BALANCE SHEET\n============\n"
+    # Slice the frame once per context used by this statement, so each
+    # period filters a pre-reduced frame rather than the whole DataFrame
+    by_context = _group_by_context(df, [context_types.get(key) for _, key in period_keys])
 
     # Process current and previous periods
-    for period_label, context_id in [
-        ('Current Period', context_types.get('current_period')),
-        ('Previous Period', context_types.get('previous_period'))
-    ]:
+    for period_label, context_key in period_keys:
+        context_id = context_types.get(context_key)
         if not context_id:
             if verbose:
-                print(f"Skipping {period_label} for balance sheet - no context ID available")
+                print(f"Skipping {period_label} for {statement_name} - no context ID available")
             continue
 
-        report += f"\n{period_label}:\n"
+        parts.append(f"\n{period_label}:\n")
         if verbose:
-            print(f"\nGenerating balance sheet for {period_label} (context: {context_id})")
-        data = get_statement_data(df, concepts, context_id, verbose)
+            print(f"\nGenerating {statement_name} for {period_label} (context: {context_id})")
+        data = get_statement_data(by_context.get(context_id, df.iloc[:0]), concepts, context_id, verbose)
 
         if data.empty:
-            report += "  No data available for this period\n"
+            parts.append("  No data available for this period\n")
             continue
 
-        # Process each section
-        for section, patterns in sections.items():
-            section_items = []
-
-            # Filter concepts for this section (case-insensitive)
-            section_concepts = [c for c in concepts if any(p.lower() in c.lower() for p in patterns)]
-            if not section_concepts:
-                if verbose:
-                    print(f"No concepts found for section: {section}")
-                continue
+        # Label every row with its section in one pass, then split with a
+        # single groupby instead of scanning data once per section
+        data = data.assign(_section=data['prefixed_concept'].map(section_of))
+        grouped = dict(iter(data.dropna(subset=['_section']).groupby('_section', sort=False)))
 
-            section_data = data[data['prefixed_concept'].isin(section_concepts)]
+        # Process each section, in section order
+        for section in section_concepts:
+            section_data = grouped.get(section)
 
-            if section_data.empty:
+            if section_data is None:
                 if verbose:
                     print(f"No data found for section: {section}")
                 continue
 
-            # Sort and prepare items
-            for _, row in section_data.iterrows():
-                concept = format_concept_name(row['prefixed_concept'])
-                try:
-                    value = row['numeric_value']  # Use the converted numeric value
-                    unit = row['unit']
-                    section_items.append((concept, unit, value))
-                except (ValueError, KeyError):
-                    if verbose:
-                        print(f"Warning: Could not convert value for {concept}: {row['value']}")
+            # Format the whole concept column at once (the vectorized
+            # equivalent of format_concept_name), then pull the columns
+            # out as arrays instead of building a Series per row
+            formatted_col = (section_data['prefixed_concept']
+                             .str.split(':', n=1).str[-1]
+                             .str.replace(_CAPS_RE, ' ', regex=True)
+                             .str.title())
+            section_items = list(zip(formatted_col.to_numpy(),
+                                     section_data['unit'].to_numpy(),
+                                     section_data['numeric_value'].to_numpy()))
 
             # Only add section if it has items
             if section_items:
-                report += f"\n{section}:\n"
-                for concept, unit, value in section_items:
-                    report += f"  {concept}: {unit} {value:,.2f}\n"
+                parts.append(f"\n{section}:\n")
+                parts.append("\n".join(f"  {concept}: {unit} {value:,.2f}"
+                                       for concept, unit, value in section_items) + "\n")
 
-    return report
+    return "".join(parts)
 
 
-def create_income_statement(df, concepts, context_types, verbose=False):
+def create_balance_sheet(df, concepts, context_types, verbose=False):
     """
-    Create a formatted income statement report.
+    Create a formatted balance sheet report.
 
     Args:
         df (pandas.DataFrame): DataFrame containing XBRL facts
-        concepts (list): List of income statement concepts
+        concepts (list): List of balance sheet concepts
         context_types (dict): Dictionary mapping context types to context IDs
         verbose (bool): Whether to print detailed generation
 
     Returns:
-        str: Formatted income statement report
+        str: Formatted balance sheet report
     """
-    # Define sections and their patterns (case-insensitive)
-    sections = {
-        'Revenue': ['revenue', 'ingreso', 'income', 'sale', 'venta'],
-        'Expenses': ['expense', 'gasto', 'cost', 'costo', 'charge'],
-        'Profit/Loss': ['profit', 'loss', 'ganancia', 'perdida', 'resultado', 'earning'],
-        'Other Items': ['tax', 'impuesto', 'comprehensive', 'other', 'otro', 'dividend']
-    }
-
-    report = "INCOME STATEMENT\n===============\n"
+    return _build_statement(
+        df, concepts, context_types, "BALANCE SHEET", _SECTION_REGEXES['balance_sheet'],
+        [('Current Period', 'current_period'),
+         ('Previous Period', 'previous_period')],
+        verbose)
 
-    # Process current and previous periods
-    for period_label, context_id in [
-        ('Current Period', context_types.get('current_year_accumulated')),
-        ('Previous Period', context_types.get('previous_year_accumulated'))
-    ]:
-        if not context_id:
-            if verbose:
-                print(f"Skipping {period_label} for income statement - no context ID available")
-            continue
 
-        report += f"\n{period_label}:\n"
-        if verbose:
-            print(f"\nGenerating income statement for {period_label} (context: {context_id})")
-        data = get_statement_data(df, concepts, context_id, verbose)
-
-        if data.empty:
-            report += "  No data available for this period\n"
-            continue
-
-        # Process each section
-        for section, patterns in sections.items():
-            section_items = []
-
-            # Filter concepts for this section (case-insensitive)
-            section_concepts = [c for c in concepts if any(p.lower() in c.lower() for p in patterns)]
-            if not section_concepts:
-                if verbose:
-                    print(f"No concepts found for section: {section}")
-                continue
-
-            section_data = data[data['prefixed_concept'].isin(section_concepts)]
-
-            if section_data.empty:
-                if verbose:
-                    print(f"No data found for section: {section}")
-                continue
-
-            # Sort and prepare items
-            for _, row in section_data.iterrows():
-                concept = format_concept_name(row['prefixed_concept'])
-                try:
-                    value = row['numeric_value']  # Use the converted numeric value
-                    unit = row['unit']
-                    section_items.append((concept, unit, value))
-                except (ValueError, KeyError):
-                    if verbose:
-                        print(f"Warning: Could not convert value for {concept}: {row['value']}")
+def create_income_statement(df, concepts, context_types, verbose=False):
+    """
+    Create a formatted income statement report.
 
-            # Only add section if it has items
-            if section_items:
-                report += f"\n{section}:\n"
-                for concept, unit, value in section_items:
-                    report += f"  {concept}: {unit} {value:,.2f}\n"
+    Args:
+        df (pandas.DataFrame): DataFrame containing XBRL facts
+        concepts (list): List of income statement concepts
+        context_types (dict): Dictionary mapping context types to context IDs
+        verbose (bool): Whether to print detailed generation
 
-    return report
+    Returns:
+        str: Formatted income statement report
+    """
+    return _build_statement(
+        df, concepts, context_types, "INCOME STATEMENT", _SECTION_REGEXES['income_statement'],
+        [('Current Period', 'current_year_accumulated'),
+         ('Previous Period', 'previous_year_accumulated')],
+        verbose)
 
 
 def create_cashflow_statement(df, concepts, context_types, verbose=False):
@@ -199,16 +232,6 @@ def create_cashflow_statement(df, concepts, context_types, verbose=False):
     Returns:
         str: Formatted cash flow statement report
     """
-    # Define sections and their patterns (case-insensitive)
-    sections = {
-        'Operating Activities': ['operating', 'operacion', 'operation'],
-        'Investing Activities': ['investing', 'inversion', 'investment'],
-        'Financing Activities': ['financing', 'financiamiento', 'finance'],
-        'Cash Summary': ['cashandcashequivalent', 'efectivo', 'netincrease', 'netdecrease', 'beginning', 'end']
-    }
-
-    report = "CASH FLOW STATEMENT\n==================\n"
-
     # Try different context types if specific cash flow contexts aren't available
     context_priorities = [
         ('current_year_accumulated', 'previous_year_accumulated'),  # First choice
@@ -216,10 +239,7 @@ def create_cashflow_statement(df, concepts, context_types, verbose=False):
     ]
 
     for current_key, previous_key in context_priorities:
-        current_context = context_types.get(current_key)
-        previous_context = context_types.get(previous_key)
-
-        if current_context or previous_context:
+        if context_types.get(current_key) or context_types.get(previous_key):
             if verbose:
                 print(f"Using context types: {current_key} and {previous_key} for cash flow statement")
             break
@@ -228,79 +248,35 @@ def create_cashflow_statement(df, concepts, context_types, verbose=False):
             print("No suitable context types found for cash flow statement")
         return "CASH FLOW STATEMENT\n==================\n\nNo suitable data found for cash flow statement"
 
-    # Process current and previous periods
-    for period_label, context_id in [
-        ('Current Period', current_context),
-        ('Previous Period', previous_context)
-    ]:
-        if not context_id:
-            if verbose:
-                print(f"Skipping {period_label} for cash flow statement - no context ID available")
-            continue
+    return _build_statement(
+        df, concepts, context_types, "CASH FLOW STATEMENT", _SECTION_REGEXES['cashflow'],
+        [('Current Period', current_key),
+         ('Previous Period', previous_key)],
+        verbose)
 
-        report += f"\n{period_label}:\n"
-        if verbose:
-            print(f"\nGenerating cash flow statement for {period_label} (context: {context_id})")
-        data = get_statement_data(df, concepts, context_id, verbose)
-
-        if data.empty:
-            report += "  No data available for this period\n"
-            continue
-
-        # Process each section
-        for section, patterns in sections.items():
-            section_items = []
-
-            # Filter concepts for this section (case-insensitive comparison)
-            section_concepts = [c for c in concepts if any(p.lower() in c.lower() for p in patterns)]
-            if not section_concepts:
-                if verbose:
-                    print(f"No concepts found for section: {section}")
-                continue
 
-            section_data = data[data['prefixed_concept'].isin(section_concepts)]
-
-            if section_data.empty:
-                if verbose:
-                    print(f"No data found for section: {section}")
-                continue
-
-            # Sort and prepare items
-            for _, row in section_data.iterrows():
-                concept = format_concept_name(row['prefixed_concept'])
-                try:
-                    value = row['numeric_value']  # Use the converted numeric value
-                    unit = row['unit']
-                    section_items.append((concept, unit, value))
-                except (ValueError, KeyError):
-                    if verbose:
-                        print(f"Warning: Could not convert value for {concept}: {row['value']}")
-
-            # Only add section if it has items
-            if section_items:
-                report += f"\n{section}:\n"
-                for concept, unit, value in section_items:
-                    report += f"  {concept}: {unit} {value:,.2f}\n"
-
-    return report
-
-
-def generate_financial_statements(df, verbose=False):
+def generate_financial_statements(df, verbose=False, statement_concepts=None, context_types=None):
     """
     Generate formatted financial statements from XBRL data.
 
     Args:
         df (pandas.DataFrame): DataFrame containing XBRL facts
         verbose (bool): Whether to print detailed generation
+        statement_concepts (dict, optional): Precomputed concept lists from
+            categorize_concepts (see analyzer.prepare_context)
+        context_types (dict, optional): Precomputed context IDs from
+            identify_contexts
 
     Returns:
         str: Formatted financial report
     """
-    # Categorize concepts for each statement type
-    statement_concepts = categorize_concepts(df, verbose)
+    # Categorize concepts for each statement type, unless precomputed
+    if statement_concepts is None:
+        statement_concepts = categorize_concepts(df, verbose)
 
-    # Identify context periods
-    context_types = identify_contexts(df, verbose)
+    # Identify context periods, unless precomputed
+    if context_types is None:
+        context_types = identify_contexts(df, verbose)
 
     # Generate reports
     balance_sheet = create_balance_sheet(
@@ -313,12 +289,11 @@ def generate_financial_statements(df, verbose=False):
         df, statement_concepts['cashflow'], context_types, verbose)
 
     # Combine reports
-    full_report = f"{balance_sheet}\n\n{income_statement}\n\n{cashflow_statement}"
+    return "\n\n".join([balance_sheet, income_statement, cashflow_statement])
 
-    return full_report
 
-
-def create_excel_report(df, output_file="financial_statements.xlsx", verbose=False):
+def create_excel_report(df, output_file="financial_statements.xlsx", verbose=False,
+                        statement_concepts=None, context_types=None):
     """
     Generate Excel file with financial statements as separate sheets.
 
@@ -326,66 +301,85 @@ def create_excel_report(df, output_file="financial_statements.xlsx", verbose=Fal
         df (pandas.DataFrame): DataFrame containing XBRL facts
         output_file (str): Path to save the Excel file
         verbose (bool): Whether to print detailed generation
+        statement_concepts (dict, optional): Precomputed concept lists from
+            categorize_concepts (see analyzer.prepare_context)
+        context_types (dict, optional): Precomputed context IDs from
+            identify_contexts
 
     Returns:
         str: Path to the saved Excel file
     """
-    # Categorize concepts for each statement type
-    statement_concepts = categorize_concepts(df, verbose)
-
-    # Identify context periods
-    context_types = identify_contexts(df, verbose)
-
-    # Create Excel writer
-    with pd.ExcelWriter(output_file) as writer:
+    # Categorize concepts for each statement type, unless precomputed
+    if statement_concepts is None:
+        statement_concepts = categorize_concepts(df, verbose)
+
+    # Identify context periods, unless precomputed
+    if context_types is None:
+        context_types = identify_contexts(df, verbose)
+
+    # Slice the frame once per distinct context instead of re-filtering
+    # the full DataFrame for every sheet
+    by_ctx = _group_by_context(df, context_types.values())
+    empty = df.iloc[:0]
+
+    # Create Excel writer; xlsxwriter writes considerably faster than
+    # the default engine. Its constant-memory mode is not usable here:
+    # to_excel emits cells column by column, which that mode drops.
+    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
         # Balance Sheet - Current Period
         if 'current_period' in context_types:
             bs_data = get_statement_data(
-                df, statement_concepts['balance_sheet'], context_types['current_period'], verbose)
+                by_ctx.get(context_types['current_period'], empty),
+                statement_concepts['balance_sheet'], context_types['current_period'], verbose)
             if not bs_data.empty:
-                bs_data.to_excel(writer, sheet_name='Balance Sheet (Current)')
+                bs_data.to_excel(writer, sheet_name='Balance Sheet (Current)', index=False)
 
         # Balance Sheet - Previous Period
         if 'previous_period' in context_types:
             bs_data_prev = get_statement_data(
-                df, statement_concepts['balance_sheet'], context_types['previous_period'], verbose)
+                by_ctx.get(context_types['previous_period'], empty),
+                statement_concepts['balance_sheet'], context_types['previous_period'], verbose)
             if not bs_data_prev.empty:
-                bs_data_prev.to_excel(writer, sheet_name='Balance Sheet (Previous)')
+                bs_data_prev.to_excel(writer, sheet_name='Balance Sheet (Previous)', index=False)
 
         # Income Statement - Current Year
         if 'current_year_accumulated' in context_types:
             is_data = get_statement_data(
-                df, statement_concepts['income_statement'], context_types['current_year_accumulated'], verbose)
+                by_ctx.get(context_types['current_year_accumulated'], empty),
+                statement_concepts['income_statement'], context_types['current_year_accumulated'], verbose)
             if not is_data.empty:
-                is_data.to_excel(writer, sheet_name='Income Statement (Current)')
+                is_data.to_excel(writer, sheet_name='Income Statement (Current)', index=False)
 
         # Income Statement - Previous Year
         if 'previous_year_accumulated' in context_types:
             is_data_prev = get_statement_data(
-                df, statement_concepts['income_statement'], context_types['previous_year_accumulated'], verbose)
+                by_ctx.get(context_types['previous_year_accumulated'], empty),
+                statement_concepts['income_statement'], context_types['previous_year_accumulated'], verbose)
             if not is_data_prev.empty:
-                is_data_prev.to_excel(writer, sheet_name='Income Statement (Previous)')
+                is_data_prev.to_excel(writer, sheet_name='Income Statement (Previous)', index=False)
 
         # Cash Flow Statement - Current Year
         if 'current_year_accumulated' in context_types:
             cf_data = get_statement_data(
-                df, statement_concepts['cashflow'], context_types['current_year_accumulated'], verbose)
+                by_ctx.get(context_types['current_year_accumulated'], empty),
+                statement_concepts['cashflow'], context_types['current_year_accumulated'], verbose)
             if not cf_data.empty:
-                cf_data.to_excel(writer, sheet_name='Cash Flow (Current)')
+                cf_data.to_excel(writer, sheet_name='Cash Flow (Current)', index=False)
 
         # Cash Flow Statement - Previous Year
         if 'previous_year_accumulated' in context_types:
             cf_data_prev = get_statement_data(
-                df, statement_concepts['cashflow'], context_types['previous_year_accumulated'], verbose)
+                by_ctx.get(context_types['previous_year_accumulated'], empty),
+                statement_concepts['cashflow'], context_types['previous_year_accumulated'], verbose)
             if not cf_data_prev.empty:
-                cf_data_prev.to_excel(writer, sheet_name='Cash Flow (Previous)')
+                cf_data_prev.to_excel(writer, sheet_name='Cash Flow (Previous)', index=False)
 
         # Create a pivotable view of the data
         pivot_df = create_pivot_view(df)
         pivot_df.to_excel(writer, sheet_name='Pivot View')
 
         # All data sheet for reference
-        df.to_excel(writer, sheet_name='All Data')
+        df.to_excel(writer, sheet_name='All Data', index=False)
 
     if verbose:
         print(f"Financial statements saved to {output_file}")
@@ -4,6 +4,8 @@ Core XBRL parsing functionality.
 
 import os
 import glob
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from lxml import etree
 
 
@@ -49,6 +51,53 @@ def get_local_name(tag):
         return tag_str
 
 
+def _read_root_info(file_path):
+    """
+    Read only the root element of an XML file.
+
+    Args:
+        file_path (str): Path to the XML file
+
+    Returns:
+        tuple: (root tag, namespace map), or (None, {}) for an empty document
+    """
+    for _, elem in etree.iterparse(file_path, events=('start',), recover=True):
+        return elem.tag, dict(elem.nsmap)
+    return None, {}
+
+
+def _free_parsed_subtree(elem):
+    """
+    Release a fully processed element and its already-seen siblings.
+
+    Keeps iterparse's peak memory bounded by the largest subtree instead
+    of the whole document.
+
+    Args:
+        elem: lxml element whose subtree has been consumed
+    """
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def _free_finished_toplevel(elem):
+    """
+    Free a subtree once iterparse is back at a document-level element.
+
+    Nested elements are left alone; they are released when their
+    document-level ancestor's end event fires.
+
+    Args:
+        elem: lxml element whose subtree has been consumed
+    """
+    parent = elem.getparent()
+    if parent is not None and parent.getparent() is None:
+        _free_parsed_subtree(elem)
+
+
 def parse_xbrl_file(file_path, verbose=False):
     """
     Parse an XBRL file and extract facts.
@@ -58,34 +107,37 @@ def parse_xbrl_file(file_path, verbose=False):
         verbose (bool): Whether to print detailed information during parsing
 
     Returns:
-        list: Extracted facts
+        pandas.DataFrame: Extracted facts, one row per fact
     """
     try:
-        # Parse the XML file with a permissive parser
-        parser = etree.XMLParser(recover=True, remove_blank_text=True)
-        tree = etree.parse(file_path, parser)
-        root = tree.getroot()
+        # Read the root element up front for the namespace map; the
+        # document body is streamed below rather than held in memory
+        root_tag, nsmap = _read_root_info(file_path)
+        if root_tag is None:
+            if verbose:
+                print(f"No root element found in {file_path}")
+            return pd.DataFrame()
 
         if verbose:
-            print(f"Root element: {root.tag}")
-            print(f"Namespaces: {root.nsmap}")
-
-        # Extract contexts using element tree iteration
+            print(f"Root element: {root_tag}")
+            print(f"Namespaces: {nsmap}")
+
+        # Resolve the XBRL instance namespace so context elements can be
+        # matched with qualified tags instead of checking every node
+        xbrli_ns = nsmap.get('xbrli')
+        if xbrli_ns is None:
+            xbrli_ns = next((u for u in nsmap.values()
+                             if u and 'xbrl.org/2003/instance' in u),
+                            'http://www.xbrl.org/2003/instance')
+
+        # First pass: stream just the context elements
         contexts = {}
 
-        # Find all context elements
-        for elem in root.iter():
-            # Skip elements with non-string tags
-            if not isinstance(elem.tag, str):
-                continue
-
-            # Get local name safely
-            local_name = get_local_name(elem.tag)
-            if local_name != 'context':
-                continue
-
+        for _, elem in etree.iterparse(file_path, events=('end',),
+                                       tag=f'{{{xbrli_ns}}}context', recover=True):
             context_id = elem.get('id')
             if not context_id:
+                _free_parsed_subtree(elem)
                 continue
 
             # Initialize context data
@@ -95,42 +147,19 @@ def parse_xbrl_file(file_path, verbose=False):
             }
 
             # Find period element
-            period = None
-            for child in elem:
-                if not isinstance(child.tag, str):
-                    continue
-                child_name = get_local_name(child.tag)
-                if child_name == 'period':
-                    period = child
-                    break
+            period = elem.find(f'{{{xbrli_ns}}}period')
 
             if period is not None:
                 # Check for instant
-                instant = None
-                for p_child in period:
-                    if not isinstance(p_child.tag, str):
-                        continue
-                    p_child_name = get_local_name(p_child.tag)
-                    if p_child_name == 'instant':
-                        instant = p_child
-                        break
+                instant = period.find(f'{{{xbrli_ns}}}instant')
 
                 if instant is not None:
                     context_data['period_type'] = 'instant'
                     context_data['instant'] = instant.text.strip() if instant.text else None
                 else:
                     # Look for start/end dates
-                    start_date = None
-                    end_date = None
-
-                    for p_child in period:
-                        if not isinstance(p_child.tag, str):
-                            continue
-                        p_child_name = get_local_name(p_child.tag)
-                        if p_child_name == 'startDate':
-                            start_date = p_child
-                        elif p_child_name == 'endDate':
-                            end_date = p_child
+                    start_date = period.find(f'{{{xbrli_ns}}}startDate')
+                    end_date = period.find(f'{{{xbrli_ns}}}endDate')
 
                     context_data['period_type'] = 'duration'
                     context_data[
@@ -138,19 +167,7 @@ def parse_xbrl_file(file_path, verbose=False):
                     context_data['end_date'] = end_date.text.strip() if end_date is not None and end_date.text else None
 
             # Find segment for dimensions
-            segment = None
-            for child in elem:
-                if not isinstance(child.tag, str):
-                    continue
-                child_name = get_local_name(child.tag)
-                if child_name == 'entity':
-                    for e_child in child:
-                        if not isinstance(e_child.tag, str):
-                            continue
-                        e_child_name = get_local_name(e_child.tag)
-                        if e_child_name == 'segment':
-                            segment = e_child
-                            break
+            segment = elem.find(f'{{{xbrli_ns}}}entity/{{{xbrli_ns}}}segment')
 
             if segment is not None:
                 for dim in segment:
@@ -167,38 +184,49 @@ def parse_xbrl_file(file_path, verbose=False):
 
             # Store context
             contexts[context_id] = context_data
+            _free_parsed_subtree(elem)
 
         if verbose:
             print(f"Extracted {len(contexts)} contexts")
 
-        # Extract facts
-        facts = []
+        # Extract facts as one list per column rather than a dict per
+        # fact, so the DataFrame below is built from typed columns
+        concepts = []
+        prefixed_concepts = []
+        values = []
+        units = []
+        context_ids = []
+        period_types = []
+        dates = []
+        start_dates = []
+        end_dates = []
+        dimensions = []
 
         # Skip these names as they're structural elements
-        skip_names = ['context', 'unit', 'schemaRef', 'roleRef', 'arcroleRef']
-
-        # Iterate through all elements
-        for elem in root.iter():
-            # Skip elements with non-string tags
-            if not isinstance(elem.tag, str):
-                continue
-
-            # Check if it has a contextRef attribute
+        skip_names = frozenset(['context', 'unit', 'schemaRef', 'roleRef', 'arcroleRef'])
+
+        # Invert the namespace map once so prefix lookups in the facts
+        # loop are O(1) instead of a scan per fact; keep the first prefix
+        # declared for each URI, as the scan did
+        uri_to_prefix = {}
+        for p, u in nsmap.items():
+            uri_to_prefix.setdefault(u, p)
+
+        # Second pass: stream all elements, keeping only those with a
+        # contextRef attribute (anything else cannot be a fact)
+        for _, elem in etree.iterparse(file_path, events=('end',), recover=True):
             context_ref = elem.get('contextRef')
-            if not context_ref or context_ref not in contexts:
+            if context_ref is None or context_ref not in contexts:
+                _free_finished_toplevel(elem)
                 continue
 
             # Get local name and namespace prefix
             tag = elem.tag
-            if '}' in tag:
+            if isinstance(tag, str) and '}' in tag:
                 ns, local_name = tag.split('}', 1)
                 ns = ns.strip('{')
-                # Try to find the prefix for this namespace
-                prefix = None
-                for p, u in root.nsmap.items():
-                    if u == ns:
-                        prefix = p
-                        break
+                # Look up the prefix for this namespace
+                prefix = uri_to_prefix.get(ns)
 
                 # Store the prefixed name for better identification
                 if prefix:
@@ -211,51 +239,68 @@ def parse_xbrl_file(file_path, verbose=False):
 
             # Skip structural elements
             if local_name in skip_names:
+                _free_finished_toplevel(elem)
                 continue
 
             # Get value
             value = elem.text
             if value is not None:
                 value = value.strip()
+                # Whitespace-only text on a container element (e.g. an
+                # XHTML text block) is indentation, not a value; the old
+                # remove_blank_text parser never saw it
+                if not value and len(elem):
+                    _free_finished_toplevel(elem)
+                    continue
             else:
                 # Skip elements with no value
+                _free_finished_toplevel(elem)
                 continue
 
-            # Get unit
-            unit_ref = elem.get('unitRef')
-
-            # Create fact record
-            fact = {
-                'concept': local_name,
-                'prefixed_concept': prefixed_name,
-                'value': value,
-                'unit': unit_ref,
-                'context_id': context_ref,
-                'period_type': contexts[context_ref]['period_type'],
-            }
-
-            # Add period information based on type
-            if contexts[context_ref]['period_type'] == 'instant':
-                fact['date'] = contexts[context_ref].get('instant')
+            # Record the fact, one scalar per column
+            context_data = contexts[context_ref]
+            concepts.append(local_name)
+            prefixed_concepts.append(prefixed_name)
+            values.append(value)
+            units.append(elem.get('unitRef'))
+            context_ids.append(context_ref)
+            period_types.append(context_data['period_type'])
+
+            # Period information depends on the context type
+            if context_data['period_type'] == 'instant':
+                dates.append(context_data.get('instant'))
+                start_dates.append(None)
+                end_dates.append(None)
             else:
-                fact['start_date'] = contexts[context_ref].get('start_date')
-                fact['end_date'] = contexts[context_ref].get('end_date')
+                dates.append(None)
+                start_dates.append(context_data.get('start_date'))
+                end_dates.append(context_data.get('end_date'))
 
-            # Add dimensions
-            fact['dimensions'] = contexts[context_ref].get('dimensions', {})
-
-            facts.append(fact)
+            dimensions.append(context_data.get('dimensions', {}))
+            _free_finished_toplevel(elem)
 
         if verbose:
-            print(f"Extracted {len(facts)} facts")
-        return facts
+            print(f"Extracted {len(concepts)} facts")
+
+        return pd.DataFrame({
+            'concept': concepts,
+            'prefixed_concept': prefixed_concepts,
+            'value': values,
+            'unit': units,
+            'context_id': context_ids,
+            'period_type': period_types,
+            'date': dates,
+            'start_date': start_dates,
+            'end_date': end_dates,
+            'dimensions': dimensions,
+        }, copy=False)
 
     except Exception as e:
         if verbose:
             print(f"Error parsing {file_path}: {str(e)}")
             import traceback
             traceback.print_exc()
-        return []
+        return pd.DataFrame()
 
 
 class XBRLParser:
@@ -292,7 +337,7 @@ class XBRLParser:
             file_path (str): Path to the XBRL file
 
         Returns:
-            list: Extracted facts
+            pandas.DataFrame: Extracted facts
         """
         return parse_xbrl_file(file_path, self.verbose)
 
@@ -304,31 +349,43 @@ class XBRLParser:
             directory (str): Path to the directory to search
 
         Returns:
-            list: Combined facts from all XBRL files
+            pandas.DataFrame: Combined facts from all XBRL files
         """
         xbrl_files = self.find_files(directory)
 
         if not xbrl_files:
             if self.verbose:
                 print("No XBRL files found.")
-            return []
+            return pd.DataFrame()
 
         if self.verbose:
             print(f"Found {len(xbrl_files)} XBRL files:")
             for file in xbrl_files:
                 print(f"  - {os.path.basename(file)}")
 
-        # Process each file
-        all_facts = []
-        for file_path in xbrl_files:
+        # Each file is independent and CPU-bound, so fan out across a
+        # process pool when there is more than one file to parse
+        if len(xbrl_files) > 1:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(parse_xbrl_file, xbrl_files, chunksize=1))
+        else:
+            results = [self.parse_file(xbrl_files[0])]
+
+        # Concatenate the per-file frames once
+        frames = []
+        for file_path, facts in zip(xbrl_files, results):
             if self.verbose:
                 print(f"\nProcessing: {os.path.basename(file_path)}")
-            facts = self.parse_file(file_path)
-            if self.verbose:
                 print(f"  - Extracted {len(facts)} facts")
-            all_facts.extend(facts)
+            if not facts.empty:
+                frames.append(facts)
+
+        if not frames:
+            return pd.DataFrame()
 
-        if self.verbose and all_facts:
+        all_facts = pd.concat(frames, ignore_index=True)
+
+        if self.verbose:
             print(f"\nTotal facts extracted: {len(all_facts)}")
 
         return all_facts
\ No newline at end of file